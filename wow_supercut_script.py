@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 import argparse
+import hashlib
 import os
 import subprocess
 import sys
@@ -7,10 +8,101 @@ import tempfile
 import re
 import shutil
 import signal
+import threading
 import logging
 from pathlib import Path
+from fractions import Fraction
 from concurrent.futures import ThreadPoolExecutor
 
+# Strips punctuation from transcribed words; \w keeps non-ASCII letters intact
+_NONWORD = re.compile(r'[^\w]+')
+
+# Persistent Whisper model cache, shared across runs
+MODEL_CACHE = os.path.expanduser("~/.cache/faster-whisper")
+
+# Downloads are cached by URL hash, so re-running on the same video skips yt-dlp
+DOWNLOAD_CACHE = Path(os.path.expanduser("~/.cache/wow-supercut"))
+
+def cached_download(stem):
+    # Only a finished file counts: skip .part/.ytdl leftovers and .fNNN/.temp intermediates
+    for p in DOWNLOAD_CACHE.glob(f"{stem}.*"):
+        if re.fullmatch(rf"{re.escape(stem)}\.\w+", p.name) and p.suffix != ".ytdl":
+            return str(p)
+    return None
+
+# Whisper batch size that fits an 8 GB GPU, by model-name prefix (large-* and
+# anything else: 4); scaled linearly with the card's actual VRAM
+BATCH_PER_8GB = {"tiny": 32, "base": 32, "small": 16, "medium": 8}
+
+def gpu_memory_mb():
+    try:
+        out = subprocess.check_output(["nvidia-smi", "--query-gpu=memory.total", "--format=csv,noheader,nounits"],
+                                      stderr=subprocess.DEVNULL, text=True)
+        return int(out.split()[0])
+    except (subprocess.SubprocessError, OSError, ValueError, IndexError):
+        return None
+
+def default_batch_size(model, vram_mb):
+    base = next((v for k, v in BATCH_PER_8GB.items() if model.startswith(k)), 4)
+    if vram_mb is None:
+        return min(base, 8)  # CPU (or unknown VRAM): bounded by RAM bandwidth, keep it modest
+    return max(1, min(32, round(base * vram_mb / 8192)))
+
+# -------------------- Encoder Presets --------------------
+# Max intervals per re-encode filter graph; each one is a live demuxer + decoder
+RENDER_BATCH = 16
+
+# Hardware encoders in probe order; libx264 is the software fallback
+HW_ENCODERS = ["h264_nvenc", "h264_videotoolbox", "h264_qsv"]
+
+# Options shared by every --quality level
+ENCODER_BASE = {
+    "h264_nvenc": {"rc": "vbr", "tune": "hq", "rc-lookahead": "20", "spatial-aq": "1", "pix_fmt": "yuv420p"},
+    "h264_videotoolbox": {"pix_fmt": "yuv420p"},
+    "h264_qsv": {"pix_fmt": "nv12"},
+    "libx264": {"pix_fmt": "yuv420p"},
+}
+
+# --quality level -> encoder-specific speed/quality knobs ("copy" skips encoding)
+ENCODER_QUALITY = {
+    "fast": {
+        "h264_nvenc": {"preset": "p1", "cq": "23"},
+        "h264_videotoolbox": {"q:v": "55"},
+        "h264_qsv": {"preset": "veryfast", "global_quality": "23"},
+        "libx264": {"preset": "veryfast", "crf": "23"},
+    },
+    "balanced": {
+        "h264_nvenc": {"preset": "p4", "cq": "20"},
+        "h264_videotoolbox": {"q:v": "65"},
+        "h264_qsv": {"preset": "medium", "global_quality": "20"},
+        "libx264": {"preset": "medium", "crf": "20"},
+    },
+    "best": {
+        "h264_nvenc": {"preset": "p7", "cq": "19"},
+        "h264_videotoolbox": {"q:v": "75"},
+        "h264_qsv": {"preset": "veryslow", "global_quality": "18"},
+        "libx264": {"preset": "slow", "crf": "18"},
+    },
+}
+
+def encoder_opts(name, quality):
+    return {**ENCODER_BASE[name], **ENCODER_QUALITY[quality][name]}
+
+def encoder_works(name, quality):
+    # Builds often list hardware encoders the machine can't drive, and some reject
+    # individual knobs (e.g. -q:v on Intel VideoToolbox), so test-encode with the
+    # exact options the render will use
+    opts = [arg for k, v in encoder_opts(name, quality).items() for arg in (f"-{k}", v)]
+    try:
+        subprocess.run(
+            ["ffmpeg", "-hide_banner", "-loglevel", "error", "-f", "lavfi", "-i", "color=s=256x256:d=0.1",
+             "-c:v", name, *opts, "-f", "null", "-"],
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True, timeout=30,
+        )
+        return True
+    except (subprocess.SubprocessError, OSError):
+        return False
+
 # -------------------- yt-dlp Silent Logger --------------------
 class QuietLogger:
     def debug(self, msg): pass
@@ -26,23 +118,33 @@ def create_venv(venv_path: Path):
     if sys.prefix == str(venv_path.resolve()):
         return
 
+    # Top-level packages only; faster_whisper pulls in ctranslate2, av and huggingface-hub itself
     required = ["faster_whisper", "ffmpeg-python", "tqdm", "yt-dlp", "rapidfuzz", "rich"]
 
     if not venv_path.exists():
         print(f"[*] Creating high-quality environment in {venv_path}...")
         venv.create(venv_path, with_pip=True)
         subprocess.check_call([str(pip_bin), "install", "-U", "pip"], stdout=subprocess.DEVNULL)
-        subprocess.check_call([str(pip_bin), "install"] + required, stdout=subprocess.DEVNULL)
+        # Wheels only (no resolver backtracking into source builds); allow sdists only if that fails
+        install = [str(pip_bin), "install", "--prefer-binary"]
+        try:
+            subprocess.check_call(install + ["--only-binary=:all:"] + required, stdout=subprocess.DEVNULL)
+        except subprocess.CalledProcessError:
+            subprocess.check_call(install + required, stdout=subprocess.DEVNULL)
 
     os.execv(str(python_bin), [str(python_bin)] + sys.argv)
 
 # -------------------- Main Logic --------------------
 def main():
+    import av
     import ffmpeg
     from yt_dlp import YoutubeDL
-    from faster_whisper import WhisperModel
+    from yt_dlp.utils import DownloadCancelled
+    from faster_whisper import WhisperModel, BatchedInferencePipeline
+    from huggingface_hub.utils import LocalEntryNotFoundError
     from tqdm import tqdm
-    from rapidfuzz import fuzz
+    import numpy as np
+    from rapidfuzz import fuzz, process
     from rich.console import Console
     from rich.table import Table
 
@@ -51,126 +153,324 @@ def main():
     parser = argparse.ArgumentParser(description="High-Quality AI Supercut Tool")
     parser.add_argument("video", help="URL or local path")
     parser.add_argument("output", help="Output path")
-    parser.add_argument("--word", required=True, help="Word to find")
+    parser.add_argument("--word", required=True, help="Word or phrase to find")
     parser.add_argument("--before", type=float, default=0.5)
     parser.add_argument("--after", type=float, default=0.5)
     parser.add_argument("--model", default="medium")
-    parser.add_argument("--threads", type=int, default=os.cpu_count())
+    parser.add_argument("--beam_size", type=int, default=1, help="Decoder beam width (1 = greedy)")
+    parser.add_argument("--batch_size", type=int, default=None,
+                        help="Batched decoding size (1 = sequential; default: picked from model size and VRAM)")
+    parser.add_argument("--fuzz_threshold", type=float, default=85, help="Minimum fuzzy match score (0-100)")
+    parser.add_argument("--compute_type", default=None, help="CTranslate2 compute type (default: int8 on CPU, int8_float16 on CUDA)")
+    parser.add_argument("--quality", choices=["fast", "balanced", "best", "copy"], default="best",
+                        help="Encoder speed/quality trade-off, or 'copy' to skip re-encoding")
+    parser.add_argument("--threads", type=int, default=os.cpu_count(), help="Encoder threads (stream-copy cuts use threads/4 workers)")
     parser.add_argument("--debug", action="store_true", help="Show all logs/warnings")
     args = parser.parse_args()
 
-    # Hardware Detection & High-Quality Encoding Params
+    # Hardware Detection
     try:
         subprocess.check_output(['nvidia-smi'], stderr=subprocess.STDOUT)
-        device, compute_type = "cuda", "float16"
-        # NVENC HQ Settings: Variable Bitrate, CQ 19, Slow Preset
-        enc_params = {"vcodec": "h264_nvenc", "rc": "vbr", "cq": "19", "preset": "slow"}
-        console.print("[bold green]✔ NVIDIA GPU Detected.[/bold green] Using HQ Hardware Encoding.")
+        device, compute_type = "cuda", "int8_float16"
+        console.print("[bold green]✔ NVIDIA GPU Detected.[/bold green] Using CUDA for transcription.")
     except:
         device, compute_type = "cpu", "int8"
-        # CPU HQ Settings: CRF 18 (Visually Lossless), Slow Preset
-        enc_params = {"vcodec": "libx264", "crf": "18", "preset": "slow"}
-        console.print("[yellow]! No GPU detected.[/yellow] Using HQ CPU Encoding (Slow but High Quality).")
+        console.print("[yellow]! No GPU detected.[/yellow] Using CPU for transcription.")
+
+    if args.batch_size is None:
+        args.batch_size = default_batch_size(args.model, gpu_memory_mb() if device == "cuda" else None)
+
+    # Encoding Params: first working hardware encoder, else libx264
+    enc_params = None
+    if args.quality == "copy":
+        console.print("[bold green]✔ Stream copy.[/bold green] Clips are not re-encoded (cuts snap to keyframes).")
+    else:
+        candidates = [e for e in HW_ENCODERS if e != "h264_nvenc" or device == "cuda"]
+        vcodec = next((e for e in candidates if encoder_works(e, args.quality)), "libx264")
+        enc_params = {"vcodec": vcodec, **encoder_opts(vcodec, args.quality)}
+        label = "Hardware" if vcodec != "libx264" else "CPU"
+        console.print(f"[bold green]✔ Encoder:[/bold green] {vcodec} ({label}, {args.quality} quality).")
+
+    if args.compute_type:
+        compute_type = args.compute_type
+
+    # Set to abort a background download (yt-dlp checks it from its progress hook)
+    cancel_download = threading.Event()
+
+    def abort_if_cancelled(status):
+        if cancel_download.is_set():
+            raise DownloadCancelled()
 
     def cleanup(sig, frame):
         console.print("\n[bold red]✖ Interrupted. Cleaning up...[/bold red]")
+        cancel_download.set()
         sys.exit(0)
 
     signal.signal(signal.SIGINT, cleanup)
 
     with tempfile.TemporaryDirectory() as tmp_dir:
-        # 1. Download
-        video_file = args.video
-        if args.video.startswith(("http", "www")):
-            console.print("[bold blue][*] Downloading Video...[/bold blue]")
-            ydl_opts = {
-                "format": "bestvideo+bestaudio/best",
-                "outtmpl": f"{tmp_dir}/in.%(ext)s",
-                "quiet": True,
-                "no_warnings": True,
-                "logger": QuietLogger() if not args.debug else None
-            }
-            with YoutubeDL(ydl_opts) as ydl:
+        # 1. Download: the video is fetched in the background while the audio
+        # track (all Whisper needs) is downloaded and transcribed
+        is_url = args.video.startswith(("http", "www"))
+        ydl_base = {
+            "quiet": True,
+            "no_warnings": True,
+            "logger": QuietLogger() if not args.debug else None
+        }
+
+        url_key = hashlib.sha256(args.video.encode()).hexdigest()[:16]
+
+        def download(kind, opts):
+            stem = f"{url_key}-{kind}"
+            cached = cached_download(stem)
+            if cached:
+                return cached
+            DOWNLOAD_CACHE.mkdir(parents=True, exist_ok=True)
+            with YoutubeDL({**ydl_base, **opts, "outtmpl": str(DOWNLOAD_CACHE / f"{stem}.%(ext)s")}) as ydl:
                 info = ydl.extract_info(args.video)
-                video_file = ydl.prepare_filename(info)
-
-        # 2. Transcribe
-        model = WhisperModel(args.model, device=device, compute_type=compute_type)
-        segments, info = model.transcribe(video_file, word_timestamps=True)
-
-        matches = []
-        target = args.word.lower()
-
-        with tqdm(total=round(info.duration), unit="s", desc="[*] Analyzing Audio", disable=args.debug) as pbar:
-            last_t = 0
-            for seg in segments:
-                if seg.words:
-                    for w in seg.words:
-                        clean = re.sub(r'[^\w]', '', w.word).lower()
-                        if fuzz.ratio(clean, target) > 85:
-                            matches.append((max(0, w.start - args.before), min(info.duration, w.end + args.after)))
-                pbar.update(seg.end - last_t)
-                last_t = seg.end
-
-        if not matches:
-            console.print(f"[bold red]No occurrences of '{args.word}' found.[/bold red]")
-            return
-
-        # 3. Merge Intervals
-        matches.sort()
-        merged = []
-        if matches:
-            curr_s, curr_e = matches[0]
-            for next_s, next_e in matches[1:]:
-                if next_s <= curr_e: curr_e = max(curr_e, next_e)
-                else:
-                    merged.append((curr_s, curr_e))
-                    curr_s, curr_e = next_s, next_e
-            merged.append((curr_s, curr_e))
-
-        # Pretty Table
-        table = Table(title=f"Matches for '{args.word}'")
-        table.add_column("Match #", justify="right", style="cyan")
-        table.add_column("Timestamp", style="magenta")
-        table.add_column("Duration", justify="right")
-        for i, (s, e) in enumerate(merged):
-            table.add_row(str(i+1), f"{s:.2f}s - {e:.2f}s", f"{e-s:.2f}s")
-        console.print(table)
-
-        # 4. Parallel Cutting (HQ Re-encoding)
-        def cut_segment(data):
-            idx, start, end = data
-            out = os.path.join(tmp_dir, f"clip_{idx}.mp4")
+                return info["requested_downloads"][0]["filepath"]
+
+        # Transcribing on CPU while the video downloads (and yt-dlp's ffmpeg merges
+        # it): give each side its own half of the cores so they don't thrash
+        # each other's caches. Linux applies affinity per thread, and child
+        # processes inherit it from the thread that spawns them. A cached video
+        # means nothing overlaps, so Whisper keeps every core.
+        whisper_cores = other_cores = None
+        pinned = False
+        if (hasattr(os, "sched_setaffinity") and device == "cpu" and is_url
+                and not cached_download(f"{url_key}-video")):
+            cores = sorted(os.sched_getaffinity(0))
+            if len(cores) > 1:
+                whisper_cores, other_cores = cores[:len(cores) // 2], cores[len(cores) // 2:]
+
+        def download_pinned(kind, opts):
+            if other_cores: os.sched_setaffinity(0, other_cores)
+            return download(kind, opts)
+
+        def unpin():
+            # Widen every thread (CTranslate2's workers included) back to all cores
+            for tid in os.listdir("/proc/self/task"):
+                try: os.sched_setaffinity(int(tid), whisper_cores + other_cores)
+                except OSError: pass
+
+        video_file = audio_file = args.video
+        downloader = ThreadPoolExecutor(max_workers=1)
+        video_job = None
+        try:
+            if is_url:
+                console.print("[bold blue][*] Downloading Audio + Video...[/bold blue]")
+                video_job = downloader.submit(download_pinned, "video", {
+                    "format": "bestvideo+bestaudio/best",
+                    "progress_hooks": [abort_if_cancelled],
+                })
+                # Kept in its original container: faster-whisper decodes it directly via PyAV
+                audio_file = download("audio", {"format": "bestaudio/best"})
+
+            # 2. Transcribe
+            if whisper_cores and not video_job.done():
+                # Set before the model loads so CTranslate2's worker threads inherit it
+                os.sched_setaffinity(0, whisper_cores)
+                pinned = True
+                # Registered after pinning: runs right away if the download already finished
+                video_job.add_done_callback(lambda _: unpin())
+            model_opts = {
+                "device": device,
+                "compute_type": compute_type,
+                "cpu_threads": len(whisper_cores) if pinned else os.cpu_count(),
+                "num_workers": 1,
+                "download_root": MODEL_CACHE,
+            }
             try:
+                # Load straight from the persistent cache; only contact the Hub on first use
+                model = WhisperModel(args.model, local_files_only=True, **model_opts)
+            except LocalEntryNotFoundError:
+                console.print(f"[bold blue][*] Downloading '{args.model}' model...[/bold blue]")
+                model = WhisperModel(args.model, **model_opts)
+            # Batched decoding pushes several VAD chunks through the decoder per step
+            transcribe_kwargs = {"batch_size": args.batch_size} if args.batch_size > 1 else {}
+            pipeline = BatchedInferencePipeline(model=model) if args.batch_size > 1 else model
+            segments, info = pipeline.transcribe(
+                audio_file,
+                **transcribe_kwargs,
+                word_timestamps=True,
+                beam_size=args.beam_size,
+                best_of=1,
+                temperature=[0.0, 0.2, 0.4],
+                # Don't feed prior text back in: stops hallucination loops on long silences
+                condition_on_previous_text=False,
+                vad_filter=True,  # Skip silent stretches entirely
+                vad_parameters={"min_silence_duration_ms": 500},
+            )
+
+            # Collect every word in one pass (as parallel arrays), then score them
+            # all in a single batch
+            query = [_NONWORD.sub('', q) for q in args.word.lower().split()]
+            target = " ".join(q for q in query if q)
+            n = max(1, len(target.split()))
+            starts, ends, texts = [], [], []
+
+            with tqdm(total=round(info.duration), unit="s", desc="[*] Analyzing Audio", disable=args.debug) as pbar:
+                last_t = 0
+                for seg in segments:
+                    for w in seg.words or ():
+                        clean = _NONWORD.sub('', w.word).lower()
+                        if clean:
+                            starts.append(w.start)
+                            ends.append(w.end)
+                            texts.append(clean)
+                    pbar.update(seg.end - last_t)
+                    last_t = seg.end
+
+            # Transcription is done (segments decode lazily above); cutting gets every core again
+            if pinned:
+                unpin()
+
+            starts = np.asarray(starts, dtype=np.float64)
+            ends = np.asarray(ends, dtype=np.float64)
+
+            # Phrases are scored against every run of n consecutive words
+            windows = [" ".join(texts[i:i + n]) for i in range(len(texts) - n + 1)]
+            scores = process.cdist([target], windows, scorer=fuzz.ratio,
+                                   score_cutoff=args.fuzz_threshold, workers=-1)
+            hits = np.flatnonzero(scores[0] > args.fuzz_threshold)
+
+            if not len(hits):
+                console.print(f"[bold red]No occurrences of '{args.word}' found.[/bold red]")
+                cancel_download.set()
+                return
+
+            # 3. Merge Intervals (vectorized)
+            hit_s = np.maximum(0, starts[hits] - args.before)
+            hit_e = np.minimum(info.duration, ends[hits + n - 1] + args.after)
+            order = np.argsort(hit_s, kind="stable")
+            hit_s, hit_e = hit_s[order], hit_e[order]
+            # An interval opens a new group when it starts after everything before it has ended
+            reach = np.maximum.accumulate(hit_e)
+            first = np.flatnonzero(np.r_[True, hit_s[1:] > reach[:-1]])
+            last = np.r_[first[1:] - 1, len(hit_s) - 1]
+            merged = list(zip(hit_s[first].tolist(), reach[last].tolist()))
+
+            # Pretty Table
+            table = Table(title=f"Matches for '{args.word}'")
+            table.add_column("Match #", justify="right", style="cyan")
+            table.add_column("Timestamp", style="magenta")
+            table.add_column("Duration", justify="right")
+            for i, (s, e) in enumerate(merged):
+                table.add_row(str(i+1), f"{s:.2f}s - {e:.2f}s", f"{e-s:.2f}s")
+            console.print(table)
+
+            if video_job:
+                if not video_job.done():
+                    console.print("[bold blue][*] Waiting for Video Download...[/bold blue]")
+                video_file = video_job.result()
+        except BaseException:
+            # Don't leave the video download running (and atexit waiting on it) after a failure
+            cancel_download.set()
+            raise
+        finally:
+            downloader.shutdown()
+
+        # Mux-only concat through PyAV: no decode, no extra ffmpeg process, no list file
+        def mux_concat(clips):
+            with av.open(args.output, "w") as out:
+                add_stream = getattr(out, "add_stream_from_template", None) or (lambda st: out.add_stream(template=st))
+                targets, offset = {}, Fraction(0)
+                for clip in clips:
+                    with av.open(clip) as inp:
+                        src = [inp.streams.video[0], inp.streams.audio[0]]
+                        if not targets:
+                            targets = {st.type: add_stream(st) for st in src}
+                        # One shift per clip (in seconds) moves its earliest presentation
+                        # time onto the end of the previous clip, keeping the A/V offset
+                        starts = [st.start_time * st.time_base for st in src if st.start_time is not None]
+                        clip_start = min(starts) if starts else Fraction(inp.start_time or 0, av.time_base)
+                        shift_s = offset - clip_start
+                        shifts = {st.type: round(shift_s / st.time_base) for st in src}
+                        clip_end = offset
+                        for pkt in inp.demux(src):
+                            if pkt.dts is None: continue  # demuxer flush packet
+                            shift = shifts[pkt.stream.type]
+                            pkt.dts += shift
+                            if pkt.pts is not None: pkt.pts += shift
+                            # Presentation end, not DTS: B-frames show after their last decode time
+                            last = pkt.pts if pkt.pts is not None else pkt.dts
+                            clip_end = max(clip_end, (last + (pkt.duration or 0)) * pkt.time_base)
+                            pkt.stream = targets[pkt.stream.type]
+                            out.mux(pkt)
+                        offset = clip_end
+
+        # 4a. Stream Copy: cut each interval without re-encoding, then concat
+        if args.quality == "copy":
+            ext = Path(video_file).suffix or ".mp4"
+
+            # Input-side -ss snaps back to the keyframe before each start, so the
+            # matched word is always inside its clip. (The segment muxer only
+            # splits at the keyframe *after* a boundary, which loses short clips.)
+            def cut_segment(data):
+                idx, start, end = data
+                out = os.path.join(tmp_dir, f"clip_{idx}{ext}")
+                # Plain argv + DEVNULL: no graph building or stderr pipe draining per clip
+                argv = [
+                    "ffmpeg", "-y", "-loglevel", "error" if not args.debug else "info",
+                    "-ss", f"{start:.3f}", "-to", f"{end:.3f}", "-i", video_file,
+                    "-c", "copy", "-avoid_negative_ts", "make_zero", out,
+                ]
+                try:
+                    subprocess.run(argv, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                   stderr=None if args.debug else subprocess.DEVNULL, check=True)
+                    return out
+                except subprocess.CalledProcessError: return None
+
+            console.print(f"[bold blue][*] Cutting {len(merged)} clips (stream copy)...[/bold blue]")
+            tasks = [(i, m[0], m[1]) for i, m in enumerate(merged)]
+            # Copy cuts are disk-bound; a few concurrent demuxers is plenty, more just thrash I/O
+            with ThreadPoolExecutor(max_workers=max(1, args.threads // 4)) as exec:
+                clips = list(tqdm(exec.map(cut_segment, tasks), total=len(tasks), desc="[*] Cutting Clips", disable=args.debug))
+
+            clips = [c for c in clips if c]
+            if not clips:
+                console.print("[bold red]✖ No clips could be cut; nothing to merge.[/bold red]")
+                sys.exit(1)
+            if len(clips) < len(merged):
+                console.print(f"[yellow]! {len(merged) - len(clips)} of {len(merged)} clips failed to cut and were skipped.[/yellow]")
+
+            console.print("[bold blue][*] Merging Final Supercut...[/bold blue]")
+            mux_concat(clips)
+
+        # 4b. Batched Single-Pass Cutting (Re-encoding)
+        else:
+            # Each ffmpeg process cuts a batch of intervals and concatenates them
+            # in one filter graph. Each interval is its own input with -ss/-to
+            # ahead of -i, so ffmpeg seeks via the container index rather than
+            # decoding from the start. Every input holds a live demuxer+decoder,
+            # so batches are capped at RENDER_BATCH inputs (memory and argv length
+            # stay bounded) and the batch outputs are then joined by stream copy.
+            batches = [merged[i:i + RENDER_BATCH] for i in range(0, len(merged), RENDER_BATCH)]
+
+            def render(batch, out):
+                streams = []
+                for s, e in batch:
+                    clip = ffmpeg.input(video_file, ss=s, to=e)
+                    streams += [clip.video, clip.audio]
+                joined = ffmpeg.concat(*streams, v=1, a=1).node
                 (
-                    ffmpeg.input(video_file, ss=start, to=end)
-                    .output(out, acodec="aac", pix_fmt="yuv420p", loglevel="error" if not args.debug else "info", **enc_params)
+                    ffmpeg.output(joined[0], joined[1], out, acodec="aac", threads=args.threads,
+                                  loglevel="error" if not args.debug else "info", **enc_params)
                     .overwrite_output()
                     .run(capture_stdout=True, capture_stderr=True)
                 )
-                return out
-            except: return None
-
-        console.print(f"[bold blue][*] Cutting {len(merged)} clips in High Quality...[/bold blue]")
-        tasks = [(i, m[0], m[1]) for i, m in enumerate(merged)]
-        with ThreadPoolExecutor(max_workers=args.threads) as exec:
-            clips = list(tqdm(exec.map(cut_segment, tasks), total=len(tasks), desc="[*] Rendering Clips", disable=args.debug))
-
-        # 5. Final Concat
-        clips = [c for c in clips if c]
-        list_file = os.path.join(tmp_dir, "list.txt")
-        with open(list_file, "w") as f:
-            for c in clips: f.write(f"file '{os.path.abspath(c)}'\n")
-
-        console.print("[bold blue][*] Merging Final Supercut...[/bold blue]")
-        (
-            ffmpeg.input(list_file, format="concat", safe=0)
-            .output(args.output, c="copy", loglevel="error" if not args.debug else "info")
-            .overwrite_output()
-            .run(capture_stdout=True, capture_stderr=True)
-        )
 
-        console.print(f"\n[bold green]✔ SUCCESS![/bold green] High-quality supercut saved to: [bold underline]{args.output}[/bold underline]")
+            console.print(f"[bold blue][*] Rendering {len(merged)} clips ({args.quality} quality)...[/bold blue]")
+            if len(batches) == 1:
+                render(batches[0], args.output)
+            else:
+                parts = [os.path.join(tmp_dir, f"part_{i:05d}.mp4") for i in range(len(batches))]
+                for batch, part in tqdm(list(zip(batches, parts)), desc="[*] Rendering Batches", disable=args.debug):
+                    render(batch, part)
+                console.print("[bold blue][*] Merging Final Supercut...[/bold blue]")
+                mux_concat(parts)
+
+        console.print(f"\n[bold green]✔ SUCCESS![/bold green] Supercut saved to: [bold underline]{args.output}[/bold underline]")
 
 if __name__ == "__main__":
     VENV_PATH = Path("./wow_env")